@@ -102,6 +102,12 @@ def main(args=None):  # pylint: disable=R0915
         action="store_true",
         help="do not validate external file references",
     )
+    parser.add_argument(
+        "--ref-index",
+        metavar="PATH",
+        help="reuse external reference search results stored in a file "
+        "(ignored with --no-cache)",
+    )
     parser.add_argument(
         "-C",
         "--no-child-check",
@@ -34,6 +34,7 @@ class SettingsTestCase(unittest.TestCase):
             settings.CACHE_DOCUMENTS,
             settings.CACHE_ITEMS,
             settings.CACHE_PATHS,
+            settings.REF_INDEX_PATH,
             settings.WARN_ALL,
             settings.ERROR_ALL,
             settings.SERVER_HOST,
@@ -54,6 +55,7 @@ class SettingsTestCase(unittest.TestCase):
             settings.CACHE_DOCUMENTS,
             settings.CACHE_ITEMS,
             settings.CACHE_PATHS,
+            settings.REF_INDEX_PATH,
             settings.WARN_ALL,
             settings.ERROR_ALL,
             settings.SERVER_HOST,
@@ -40,6 +40,7 @@ class TestMain(SettingsTestCase):
         self.assertTrue(settings.CACHE_DOCUMENTS)
         self.assertTrue(settings.CACHE_ITEMS)
         self.assertTrue(settings.CACHE_PATHS)
+        self.assertIsNone(settings.REF_INDEX_PATH)
         self.assertFalse(settings.WARN_ALL)
         self.assertFalse(settings.ERROR_ALL)
 
@@ -58,6 +59,8 @@ class TestMain(SettingsTestCase):
                     "--no-suspect-check",
                     "--no-review-check",
                     "--no-cache",
+                    "--ref-index",
+                    "refs.db",
                     "--warn-all",
                     "--error-all",
                 ]
@@ -73,9 +76,16 @@ class TestMain(SettingsTestCase):
         self.assertFalse(settings.CACHE_DOCUMENTS)
         self.assertFalse(settings.CACHE_ITEMS)
         self.assertFalse(settings.CACHE_PATHS)
+        self.assertEqual("refs.db", settings.REF_INDEX_PATH)
         self.assertTrue(settings.WARN_ALL)
         self.assertTrue(settings.ERROR_ALL)
 
+    @patch("doorstop.cli.commands.run", Mock())
+    def test_ref_index_without_cache(self):
+        """Verify a warning is shown when the reference index is ignored."""
+        with self.assertLogs("doorstop.cli.utilities", "WARNING"):
+            main.main(["--ref-index", "refs.db", "--no-cache"])
+
     def test_main(self):
         testargs = [sep.join(["doorstop", "cli", "main.py"])]
         with patch.object(sys, "argv", testargs):
@@ -91,6 +91,8 @@ def configure_settings(args):
         settings.CHECK_LEVELS = args.no_level_check is False
     if args.no_ref_check is not None:
         settings.CHECK_REF = args.no_ref_check is False
+    if args.ref_index is not None:
+        settings.REF_INDEX_PATH = args.ref_index
     if args.no_child_check is not None:
         settings.CHECK_CHILD_LINKS = args.no_child_check is False
     if args.strict_child_check is not None:
@@ -103,6 +105,8 @@ def configure_settings(args):
         settings.CACHE_DOCUMENTS = args.no_cache is False
         settings.CACHE_ITEMS = args.no_cache is False
         settings.CACHE_PATHS = args.no_cache is False
+        if settings.REF_INDEX_PATH and not settings.CACHE_PATHS:
+            log.warning("--ref-index is ignored with --no-cache")
     if args.warn_all is not None:
         settings.WARN_ALL = args.warn_all is True
     if args.error_all is not None:
@@ -3,7 +3,6 @@
 """Representation of an item in a document."""
 
 import functools
-import linecache
 import os
 from typing import Any, List
 
@@ -703,9 +702,6 @@ class Item(BaseFileObject):  # pylint: disable=R0902
         if not self.ref:
             log.debug("no external reference to search for")
             return None, None
-        # Update the cache
-        if not settings.CACHE_PATHS:
-            linecache.clearcache()
         # Search for the external reference
         return self.reference_finder.find_ref(self.ref, self.tree, self.path)
 
@@ -728,8 +724,6 @@ class Item(BaseFileObject):  # pylint: disable=R0902
         if not self.references:
             log.debug("no external reference to search for")
             return []
-        if not settings.CACHE_PATHS:
-            linecache.clearcache()
 
         references = []
         for ref_item in self.references:
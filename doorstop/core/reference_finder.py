@@ -2,15 +2,521 @@
 
 """Finding external references."""
 
-import linecache
+import functools
 import os
 import re
+import sqlite3
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing, contextmanager
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 from doorstop import common, settings
 from doorstop.common import DoorstopError, DoorstopWarning
+from doorstop.core.vcs.base import BaseWorkingCopy, PathIndex
 
 log = common.logger(__name__)
 
+# number of files scanned concurrently, as in ThreadPoolExecutor's default
+_SCAN_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# path patterns that only select an extension, e.g. '.*\.md' or '.*\.md$'
+_EXTENSION_PATTERN = re.compile(r"^\.\*\\\.(\w+)(\$?)$")
+
+
+def _is_word(char):
+    """Determine if a character can join a token to its surroundings.
+
+    Non-ASCII characters are all treated as word characters, so a token
+    is never found inside a longer word written in UTF-8.
+
+    """
+    return not char.isascii() or char.isalnum() or char == "_"
+
+
+# byte values that can join a token to its surroundings, including every
+# byte of a UTF-8 encoded non-ASCII character
+_WORD_BYTES = bytes(_is_word(chr(value)) for value in range(256))
+
+
+@functools.lru_cache(maxsize=8192)
+def _token_pattern(token):
+    """Get an escaped bytes pattern matching a token delimited by non-word characters.
+
+    A boundary is only required next to a token's word characters; a
+    leading or trailing non-word character delimits the token itself.
+    Bytes of non-ASCII characters count as word characters, see
+    :func:`_is_word`.
+
+    """
+    pattern = re.escape(token.encode("utf-8"))
+    if _is_word(token[:1]):
+        pattern = rb"(?<![\w\x80-\xff])" + pattern
+    if _is_word(token[-1:]):
+        pattern += rb"(?![\w\x80-\xff])"
+    return pattern
+
+
+@functools.lru_cache(maxsize=4096)
+def _boundary_regex(*tokens):
+    """Get a compiled bytes regex finding any of several delimited tokens.
+
+    Each match is empty and captures the longest token starting at its
+    offset, so the occurrences of different tokens may overlap.
+
+    """
+    ordered = sorted(tokens, key=len, reverse=True)
+    patterns = [_token_pattern(token) for token in ordered]
+    return re.compile(b"(?=(" + b"|".join(patterns) + b"))", re.ASCII)
+
+
+def _token_prefixes(tokens):
+    """Get the shorter tokens each token starts with.
+
+    :return: dictionary of token to (prefix, whether a word character
+        may not follow the prefix) tuples
+
+    """
+    encoded = {token.encode("utf-8") for token in tokens}
+    prefixes: Dict[bytes, List[Tuple[bytes, int]]] = {}
+    for token in encoded:
+        for end in range(len(token) - 1, 0, -1):
+            if token[:end] in encoded:
+                check_end = _WORD_BYTES[token[end - 1]]
+                prefixes.setdefault(token, []).append((token[:end], check_end))
+    return prefixes
+
+
+@functools.lru_cache(maxsize=4096)
+def _token_finder(*tokens):
+    """Get a function yielding the offset of each delimited token in some data.
+
+    A single token is located with a substring search and a lookup of
+    its neighbouring bytes, which is much cheaper than running a regex.
+    Several tokens share one boundary regex, and the shorter tokens a
+    matched token starts with are checked at the same offset, so every
+    token is found wherever it would be found on its own.
+
+    """
+    if len(tokens) != 1:
+        regex = _boundary_regex(*tokens)
+        log.trace("regex: %s", regex.pattern)  # type: ignore
+        prefixes = _token_prefixes(tokens)
+
+        def find_any(data):
+            size = len(data)
+            for match in regex.finditer(data):
+                offset, token = match.start(), match.group(1)
+                yield offset, token
+                for prefix, check_end in prefixes.get(token, ()):
+                    end = offset + len(prefix)
+                    joined_after = check_end and end < size and _WORD_BYTES[data[end]]
+                    if not joined_after:
+                        yield offset, prefix
+
+        return find_any
+
+    token = tokens[0].encode("utf-8")
+    length = len(token)
+    check_start = _is_word(tokens[0][:1])
+    check_end = _is_word(tokens[0][-1:])
+
+    def find_one(data):
+        size = len(data)
+        offset = data.find(token)
+        while offset >= 0:
+            end = offset + length
+            joined_before = check_start and offset and _WORD_BYTES[data[offset - 1]]
+            joined_after = check_end and end < size and _WORD_BYTES[data[end]]
+            if joined_before or joined_after:
+                offset = data.find(token, offset + 1)
+            else:
+                yield offset, token
+                offset = data.find(token, max(end, offset + 1))
+
+    return find_one
+
+
+@functools.lru_cache(maxsize=256)
+def _path_regex(pattern):
+    """Get a compiled regex for a user-supplied path pattern."""
+    return re.compile(pattern)
+
+
+@functools.lru_cache(maxsize=256)
+def _path_matcher(pattern):
+    """Get a function testing paths against a user-supplied path pattern.
+
+    Patterns that only select an extension are tested with plain string
+    operations instead of a regex.
+
+    """
+    match = _EXTENSION_PATTERN.match(pattern)
+    if match:
+        extension = "." + match.group(1)
+        if match.group(2):
+            return lambda path: path.endswith(extension)
+        return lambda path: extension in path
+    return _path_regex(pattern).match
+
+
+def _pattern_paths(index, pattern):
+    """Get the paths matching a user-supplied path pattern, cached per index."""
+    paths = index.patterns.get(pattern)
+    if paths is None:
+        matches = _path_matcher(pattern)
+        paths = [
+            (path, relpath)
+            for path, _filename, _extension, relpath in index.entries
+            if matches(path)
+        ]
+        index.patterns[pattern] = paths
+    return paths
+
+
+def _text_paths(index):
+    """Get the paths not skipped by their extension, cached per index."""
+    skip_exts = frozenset(settings.SKIP_EXTS)
+    paths = index.texts.get(skip_exts)
+    if paths is None:
+        paths = [
+            (path, relpath)
+            for path, _filename, extension, relpath in index.entries
+            # Skip extensions that should not be considered text
+            if extension not in skip_exts
+        ]
+        index.texts[skip_exts] = paths
+    return paths
+
+
+def _read_bytes(path):
+    """Read a file's contents."""
+    with open(path, "rb") as stream:
+        return stream.read()
+
+
+@functools.lru_cache(maxsize=256)
+def _read_cached_bytes(path, mtime, size):  # pylint: disable=unused-argument
+    """Read a file's contents, cached until its modification time or size change."""
+    return _read_bytes(path)
+
+
+def _scan_file(path, finder, max_size=None):
+    """Yield each token found in a file with its line number.
+
+    Files larger than ``max_size`` bytes are skipped when a limit is given.
+
+    """
+    stat = os.stat(path)
+    if max_size is not None and stat.st_size > max_size:
+        log.debug("skipped large file: %s", path)
+        return
+    if settings.CACHE_PATHS:
+        data = _read_cached_bytes(path, stat.st_mtime_ns, stat.st_size)
+    else:
+        data = _read_bytes(path)
+    lineno = offset = 0
+    for start, token in finder(data):
+        lineno += data.count(b"\n", offset, start)
+        offset = start
+        yield lineno + 1, token
+
+
+def _find_lines(path, finder, max_size, count, first):
+    """Get the lines of a file on which each token is found.
+
+    :param count: number of distinct tokens the finder can find
+    :param first: only keep the first line of each token and stop
+        scanning once every token has been found
+
+    :return: dictionary of token to ascending line numbers
+
+    """
+    lines: Dict[bytes, List[int]] = {}
+    try:
+        for lineno, token in _scan_file(path, finder, max_size):
+            found = lines.setdefault(token, [])
+            if first:
+                if not found:
+                    found.append(lineno)
+                    if len(lines) == count:
+                        break
+            # Report each matching line once
+            elif not found or found[-1] != lineno:
+                found.append(lineno)
+    except OSError:
+        log.trace("unable to read lines from: %s", path)  # type: ignore
+    return lines
+
+
+@functools.lru_cache(maxsize=1)
+def _scan_executor():
+    """Get the thread pool shared by all file scans."""
+    return ThreadPoolExecutor(max_workers=_SCAN_WORKERS)
+
+
+def _scan_matches(candidates, finder, count=1, *, first=True, max_size=None):
+    """Yield the lines on which tokens are found in each candidate file.
+
+    Several files are scanned concurrently, but no more than the number
+    of workers are submitted ahead of the caller. Results are yielded in
+    the order of the candidates and outstanding scans are cancelled once
+    the caller stops iterating.
+
+    :param candidates: list of (path, relative path) tuples to scan
+    :param finder: function from :func:`_token_finder`
+    :param count: number of distinct tokens the finder can find
+    :param first: only report the first line of each token per file
+    :param max_size: skip files larger than this many bytes
+
+    :return: generator of (path, relative path, lines) tuples, with
+        lines as returned by :func:`_find_lines`
+
+    """
+    if len(candidates) <= 1:
+        for path, relpath in candidates:
+            yield path, relpath, _find_lines(path, finder, max_size, count, first)
+        return
+    executor = _scan_executor()
+    futures: Deque[Tuple[str, str, Future]] = deque()
+    try:
+        for path, relpath in candidates:
+            future = executor.submit(_find_lines, path, finder, max_size, count, first)
+            futures.append((path, relpath, future))
+            if len(futures) >= _SCAN_WORKERS:
+                done_path, done_relpath, done = futures.popleft()
+                yield done_path, done_relpath, done.result()
+        while futures:
+            done_path, done_relpath, done = futures.popleft()
+            yield done_path, done_relpath, done.result()
+    finally:
+        for _path, _relpath, future in futures:
+            future.cancel()
+
+
+class _RefStore:
+    """Reference search results persisted per reference and file.
+
+    Each file is stored with its modification time, size, and the
+    generation of references it has been searched for; each reference
+    with the generation it was first searched in. A file is only read
+    again once it changes or newer references are searched for.
+
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY,"
+                " mtime INTEGER, size INTEGER, generation INTEGER)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS refs (ref TEXT PRIMARY KEY,"
+                " generation INTEGER)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS hits (ref TEXT, path TEXT,"
+                " lineno INTEGER, PRIMARY KEY (ref, path))"
+            )
+
+    def close(self):
+        """Close the connection to the store."""
+        self.connection.close()
+
+    @staticmethod
+    def _stamp(path):
+        """Get the modification time and size of a file, if it can be read."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        """Get the stored references, files, and first lines of each file."""
+        refs = dict(self.connection.execute("SELECT ref, generation FROM refs"))
+        files = {
+            path: ((mtime, size), generation)
+            for path, mtime, size, generation in self.connection.execute(
+                "SELECT path, mtime, size, generation FROM files"
+            )
+        }
+        hits: Dict[str, Dict[bytes, List[int]]] = {}
+        for ref, path, lineno in self.connection.execute(
+            "SELECT ref, path, lineno FROM hits"
+        ):
+            hits.setdefault(path, {})[ref.encode("utf-8")] = [lineno]
+        return refs, files, hits
+
+    def scan_matches(self, candidates, tokens, max_size):
+        """Yield the lines on which tokens are found in each candidate file.
+
+        Results match :func:`_scan_matches` with ``first`` set, but may
+        include other stored references. Files that changed or were not
+        searched for every stored reference are scanned for all of them.
+
+        """
+        refs, files, hits = self._load()
+        generation = max(refs.values(), default=0)
+        new = [token for token in tokens if token not in refs]
+        if new:
+            generation += 1
+        everything = list(refs) + new
+
+        # Skip the store's own file while searching
+        candidates = [
+            (path, relpath)
+            for path, relpath in candidates
+            if os.path.abspath(path) != self.path
+        ]
+        stamps = {}
+        cached: Dict[str, Dict[bytes, List[int]]] = {}
+        for path, _relpath in candidates:
+            stamp = self._stamp(path)
+            if stamp is None or (max_size is not None and stamp[1] > max_size):
+                cached[path] = {}
+            elif files.get(path) == (stamp, generation):
+                cached[path] = hits.get(path, {})
+            else:
+                stamps[path] = stamp
+
+        file_rows: List[Tuple[str, int, int, int]] = []
+        hit_rows: List[Tuple[str, str, int]] = []
+        scanned = _scan_matches(
+            [candidate for candidate in candidates if candidate[0] not in cached],
+            _token_finder(*everything),
+            len(everything),
+            max_size=max_size,
+        )
+        try:
+            for path, relpath in candidates:
+                lines = cached.get(path)
+                if lines is None:
+                    match = next(scanned, None)
+                    if match is None:
+                        break
+                    lines = match[2]
+                    file_rows.append((path, *stamps[path], generation))
+                    hit_rows.extend(
+                        (token.decode("utf-8"), path, linenos[0])
+                        for token, linenos in lines.items()
+                    )
+                yield path, relpath, lines
+        finally:
+            scanned.close()
+            stale = files.keys() - {path for path, _relpath in candidates}
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO refs VALUES (?, ?)",
+                    [(token, generation) for token in new],
+                )
+                for path in stale | {row[0] for row in file_rows}:
+                    self.connection.execute("DELETE FROM hits WHERE path = ?", (path,))
+                self.connection.executemany(
+                    "DELETE FROM files WHERE path = ?", [(path,) for path in stale]
+                )
+                self.connection.executemany(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)", file_rows
+                )
+                self.connection.executemany(
+                    "INSERT INTO hits VALUES (?, ?, ?)", hit_rows
+                )
+
+
+@functools.lru_cache(maxsize=4)
+def _open_ref_store(path):
+    """Open the persistent store of reference search results at a path."""
+    log.debug("opening reference index: %s", path)
+    return _RefStore(path)
+
+
+def _ref_store():
+    """Get the persistent store of reference search results, if enabled."""
+    if settings.REF_INDEX_PATH and settings.CACHE_PATHS:
+        return _open_ref_store(os.path.abspath(settings.REF_INDEX_PATH))
+    return None
+
+
+class _RefBatch:
+    """References of a tree's items, searched together on first use."""
+
+    def __init__(self, tree, skip):
+        self.tree = tree
+        self.skip = skip
+        self.results: Optional[Dict[Tuple[str, str], Tuple[str, Any]]] = None
+
+    def get(self, ref, item_path):
+        """Get the result for an item's reference, if it is in the batch."""
+        if self.results is None:
+            items = [
+                item
+                for document in self.tree
+                if document.prefix not in self.skip
+                for item in document.items
+                if item.active and item.ref
+            ]
+            log.info("searching for the refs of %s items...", len(items))
+            refs = [item.ref for item in items]
+            paths = [os.path.normpath(item.path) for item in items]
+            found = ReferenceFinder.find_refs_batch(refs, self.tree, paths)
+            self.results = dict(zip(zip(refs, paths), found))
+        return self.results.get((ref, os.path.normpath(item_path)))
+
+
+# batches of references searched together, by tree
+_BATCHES: Dict[int, _RefBatch] = {}
+
+
+def _path_index(vcs):
+    """Get the path lookup tables for a working copy."""
+    if isinstance(vcs, BaseWorkingCopy):
+        return vcs.path_index
+    return PathIndex(list(vcs.paths))
+
+
+def _scan_refs(tokens, pending, results, index, item_paths):
+    """Search the working copy for tokens in a single pass over its files.
+
+    :param tokens: tokens to search for
+    :param pending: positions of the unresolved results for each token,
+        updated as tokens are found
+    :param results: results to fill in by position
+    :param index: path lookup tables of the working copy
+    :param item_paths: paths of the items owning each result
+
+    """
+    candidates = _text_paths(index)
+    max_size = settings.MAX_REF_SCAN_BYTES
+    store = _ref_store()
+    if store:
+        matches = store.scan_matches(candidates, tokens, max_size)
+    else:
+        finder = _token_finder(*tokens)
+        matches = _scan_matches(candidates, finder, len(tokens), max_size=max_size)
+    with closing(matches):
+        for path, relpath, lines in matches:
+            for token, (lineno,) in lines.items():
+                token = token.decode("utf-8")
+                positions = pending.get(token)
+                if not positions:
+                    continue
+                # Skip the item's file while searching
+                remaining = [p for p in positions if item_paths[p] == path]
+                if len(remaining) == len(positions):
+                    continue
+                log.debug("found ref: %s", relpath)
+                for position in positions:
+                    if item_paths[position] != path:
+                        results[position] = relpath, lineno
+                if remaining:
+                    pending[token] = remaining
+                else:
+                    del pending[token]
+            if not pending:
+                return
+
 
 class ReferenceFinder:
     """Finds files referenced from an Item."""
@@ -28,36 +534,74 @@ class ReferenceFinder:
             filename) or None (when no reference set)
 
         """
+        batch = _BATCHES.get(id(tree))
+        if batch is not None:
+            result = batch.get(ref, item_path)
+            if result is not None:
+                return result
+        return ReferenceFinder.find_refs_batch([ref], tree, [item_path])[0]
 
-        # Search for the external reference
-        log.debug("searching for ref '{}'...".format(ref))
-        pattern = r"(\b|\W){}(\b|\W)".format(re.escape(ref))
-        # pattern = r"(\b|\W){}[^A-Za-z0-9.]".format(re.escape(ref))
-        log.trace("regex: {}".format(pattern))  # type: ignore
-        regex = re.compile(pattern)
-        for path, filename, relpath in tree.vcs.paths:
-            # Skip the item's file while searching
-            if path == item_path:
-                continue
-            # Check for a matching filename
-            if filename == ref:
-                return relpath, None
-            # Skip extensions that should not be considered text
-            if os.path.splitext(filename)[-1] in settings.SKIP_EXTS:
-                continue
-            # Search for the reference in the file
-            try:
-                lines = linecache.getlines(path)
-            except (SyntaxError, UnicodeDecodeError):
-                log.trace("unable to read lines from: {}".format(path))  # type: ignore
-                continue
-            for lineno, line in enumerate(lines, start=1):
-                if regex.search(line):
-                    log.debug("found ref: {}".format(relpath))
-                    return relpath, lineno
+    @staticmethod
+    def find_refs_batch(refs, tree, item_paths):
+        """Get the external file references and line numbers of many items.
 
-        log.debug("external reference not found: {}".format(ref))
-        return '', ''
+        Every file is scanned at most once for all of the references.
+
+        :param refs: external references to search for
+        :param tree: tree whose working copy is searched
+        :param item_paths: paths of the items owning each reference
+
+        :return: list of results in the same order as ``refs``, each
+            as returned by :meth:`find_ref`
+
+        """
+        results: List[Tuple[str, Any]] = [("", "")] * len(refs)
+        index = _path_index(tree.vcs)
+        item_paths = [os.path.normpath(item_path) for item_path in item_paths]
+
+        # Check for matching filenames
+        pending: Dict[str, List[int]] = {}
+        for position, (ref, item_path) in enumerate(zip(refs, item_paths)):
+            log.debug("searching for ref '%s'...", ref)
+            for path, relpath in index.filenames.get(ref, ()):
+                if path != item_path:
+                    results[position] = relpath, None
+                    break
+            else:
+                pending.setdefault(ref, []).append(position)
+
+        # Search for the references in the files
+        if pending:
+            _scan_refs(list(pending), pending, results, index, item_paths)
+
+        for ref in pending:
+            log.debug("external reference not found: %s", ref)
+        return results
+
+    @staticmethod
+    @contextmanager
+    def batch(tree, skip=None):
+        """Search the references of a tree's items together within a context.
+
+        The first :meth:`find_ref` call for the tree searches the
+        references of all its items, scanning every file at most once.
+        Later calls are answered from those results until the context
+        exits.
+
+        :param tree: tree whose items' references are searched
+        :param skip: list of document prefixes to skip
+
+        """
+        key = id(tree)
+        previous = _BATCHES.get(key)
+        _BATCHES[key] = _RefBatch(tree, [] if skip is None else skip)
+        try:
+            yield
+        finally:
+            if previous is None:
+                del _BATCHES[key]
+            else:
+                _BATCHES[key] = previous
 
     @staticmethod
     def find_file_reference(ref_path, root, tree, item_path, keyword=None):
@@ -70,34 +614,32 @@ class ReferenceFinder:
 
         """
 
-        log.debug("searching for ref '{}'...".format(ref_path))
+        log.debug("searching for ref '%s'...", ref_path)
         ref_full_path = os.path.normpath(os.path.join(root, ref_path))
 
-        for path, _filename, relpath in tree.vcs.paths:
-            # Skip the item's file while searching
-            if path == item_path:
-                continue
-            if path == ref_full_path:
-                if keyword is None:
-                    return relpath, None
-
-                # Search for the reference in the file
-                try:
-                    lines = linecache.getlines(path)
-                except SyntaxError:
-                    log.trace("unable to read lines from: {}".format(path))  # type: ignore
-                    continue
+        finder = None
+        if keyword is not None:
+            log.debug("searching for ref '%s'...", keyword)
+            finder = _token_finder(keyword)
 
-                log.debug("searching for ref '{}'...".format(keyword))
-                pattern = r"(\b|\W){}(\b|\W)".format(re.escape(keyword))
-                log.trace("regex: {}".format(pattern))  # type: ignore
-                regex = re.compile(pattern)
-                for lineno, line in enumerate(lines, start=1):
-                    if regex.search(line):
-                        log.debug("found ref: {}".format(relpath))
-                        return relpath, lineno
+        item_path = os.path.normpath(item_path)
+        candidates = [
+            (path, relpath)
+            for path, _filename, _extension, relpath in _path_index(tree.vcs).entries
+            # Skip the item's file while searching
+            if path == ref_full_path and path != item_path
+        ]
+        if finder is None:
+            for _path, relpath in candidates:
+                return relpath, None
+        else:
+            # Search for the reference in the file
+            for _path, relpath, lines in _scan_matches(candidates, finder):
+                for (lineno,) in lines.values():
+                    log.debug("found ref: %s", relpath)
+                    return relpath, lineno
 
-        log.debug("external reference not found: {}".format(ref_path))
+        log.debug("external reference not found: %s", ref_path)
         return '', ''
 
     @staticmethod
@@ -112,42 +654,36 @@ class ReferenceFinder:
 
         """
 
-        log.debug("searching for pattern '{}'...".format(pattern))
+        log.debug("searching for pattern '%s'...", pattern)
 
-        if keyword == None :
+        if not keyword:
             msg = "find_pattern_reference without keyword: {}".format(pattern)
             raise DoorstopError(msg)
 
         reflist = []
 
-        rex = re.compile(pattern)
-        for path, _filename, relpath in tree.vcs.paths:
-            # Skip the item's file while searching
-            if path == item_path:
-                continue
-            # if re.match(".*\.md", path):
-            log.debug("check ref in '{}'...".format(path))
-            if rex.match(path):
-                log.debug("got ref in '{}'...".format(path))
-
-                # Search for the reference in the file
-                try:
-                    lines = linecache.getlines(path)
-                except SyntaxError:
-                    log.trace("unable to read lines from: {}".format(path))  # type: ignore
-                    continue
+        log.debug("searching pattern for keyword '%s'...", keyword)
+        finder = _token_finder(keyword)
+        index = _path_index(tree.vcs)
+        item_path = os.path.normpath(item_path)
 
-                log.debug("searching pattern for keyword '{}'...".format(re.escape(keyword)))
-                pattern = r"(\b|\W){}(\b|\W)".format(re.escape(keyword))
-                log.trace("regex: {}".format(pattern))  # type: ignore
-                regex = re.compile(pattern)
-                for lineno, line in enumerate(lines, start=1):
-                    if regex.search(line):
-                        log.debug("found ref: {}".format(relpath))
-                        reflist.append( (relpath, lineno) )
+        candidates = [
+            (path, relpath)
+            for path, relpath in _pattern_paths(index, pattern)
+            # Skip the item's file while searching
+            if path != item_path
+        ]
+        # Search for the reference in the files
+        for _path, relpath, lines in _scan_matches(
+            candidates, finder, first=False, max_size=settings.MAX_REF_SCAN_BYTES
+        ):
+            for linenos in lines.values():
+                for lineno in linenos:
+                    log.debug("found ref: %s", relpath)
+                    reflist.append( (relpath, lineno) )
 
         if reflist :
             return reflist
 
-        log.debug("external pattern reference not found: {}".format(keyword))
+        log.debug("external pattern reference not found: %s", keyword)
         return '', ''
@@ -3,13 +3,26 @@
 
 """Unit tests for the doorstop.core.reference_finder module."""
 
+# pylint: disable=protected-access
+
 import os
+import shutil
+import sqlite3
+import tempfile
 import unittest
-from unittest.mock import Mock
+from unittest.mock import MagicMock, Mock, patch
 
+from doorstop import settings
 from doorstop.common import DoorstopError
-from doorstop.core.reference_finder import ReferenceFinder
-from doorstop.core.tests import TESTS_ROOT, MockItem, MockSimpleDocument
+from doorstop.core.reference_finder import (
+    _SCAN_WORKERS,
+    ReferenceFinder,
+    _find_lines,
+    _open_ref_store,
+    _scan_matches,
+    _scan_refs,
+)
+from doorstop.core.tests import EXTERNAL, TESTS_ROOT, MockItem, MockSimpleDocument
 from doorstop.core.vcs.mockvcs import WorkingCopy
 
 
@@ -20,6 +33,18 @@ class TestReferenceFinder(unittest.TestCase):
         path = os.path.join("path", "to", "RQ001.yml")
         self.item = MockItem(MockSimpleDocument(), path)
 
+    def ref_store(self, path):
+        """Get a reference store path that is closed when the test ends.
+
+        Register this after removing the store's directory, as cleanups
+        run in reverse order and an open store cannot be removed on Windows.
+
+        """
+        path = os.path.abspath(path)
+        self.addCleanup(_open_ref_store.cache_clear)
+        self.addCleanup(lambda: _open_ref_store(path).close())
+        return path
+
     def test_find_file_reference_no_keyword(self):
         reference_path = "files/REQ001.yml"
         root = TESTS_ROOT
@@ -139,3 +164,294 @@ class TestReferenceFinder(unittest.TestCase):
             reference_finder.find_file_reference(reference_path, root, tree, item_path)
 
         self.assertTrue("external reference not found" in str(context.exception))
+
+    def test_find_pattern_reference_multiple_files(self):
+        pattern = r".*REQ00[36]\.yml$"
+        root = TESTS_ROOT
+        tree = Mock()
+        tree.vcs = WorkingCopy(TESTS_ROOT)
+        item_path = os.path.join("path", "to", "RQ001.yml")
+
+        reference_finder = ReferenceFinder()
+        references = reference_finder.find_pattern_reference(
+            pattern, root, tree, item_path, "REF123"
+        )
+
+        self.assertEqual(
+            sorted(references),
+            [
+                (os.path.join("files", "REQ003.yml"), 8),
+                (os.path.join("files", "REQ006.yml"), 10),
+            ],
+        )
+
+    def test_find_pattern_reference_empty_keyword(self):
+        tree = Mock()
+        tree.vcs = WorkingCopy(TESTS_ROOT)
+        item_path = os.path.join("path", "to", "RQ001.yml")
+
+        reference_finder = ReferenceFinder()
+
+        with patch("doorstop.core.reference_finder._scan_matches") as mock_scan:
+            with self.assertRaises(DoorstopError):
+                reference_finder.find_pattern_reference(
+                    r".*\.yml$", TESTS_ROOT, tree, item_path, ""
+                )
+
+        mock_scan.assert_not_called()
+
+    def test_find_ref_filename_should_skip_item_path(self):
+        tree = Mock()
+        tree.vcs = WorkingCopy(TESTS_ROOT)
+        item_path = os.path.join("path", "to", "REF123")
+        other_path = os.path.join("other", "REF123")
+        tree.vcs._path_cache = [
+            (item_path, "REF123", "to/REF123"),
+            (other_path, "REF123", "other/REF123"),
+        ]
+
+        reference_finder = ReferenceFinder()
+        path, line = reference_finder.find_ref("REF123", tree, item_path)
+
+        self.assertEqual(path, "other/REF123")
+        self.assertEqual(line, None)
+
+    def test_find_ref_in_file_contents(self):
+        tree = Mock()
+        tree.vcs = WorkingCopy(EXTERNAL)
+
+        reference_finder = ReferenceFinder()
+        path, line = reference_finder.find_ref("REF123", tree, "RQ001.yml")
+
+        self.assertEqual(path, "text.txt")
+        self.assertEqual(line, 3)
+
+    @patch("doorstop.settings.MAX_REF_SCAN_BYTES", 1)
+    def test_find_ref_should_skip_large_files(self):
+        tree = Mock()
+        tree.vcs = WorkingCopy(EXTERNAL)
+
+        reference_finder = ReferenceFinder()
+        path, line = reference_finder.find_ref("REF123", tree, "RQ001.yml")
+
+        self.assertEqual((path, line), ("", ""))
+
+    def test_find_refs_batch(self):
+        tree = Mock()
+        tree.vcs = WorkingCopy(EXTERNAL)
+        refs = ["REF124", "REF122", "REF123", "REF999"]
+
+        reference_finder = ReferenceFinder()
+        results = reference_finder.find_refs_batch(refs, tree, ["RQ001.yml"] * 4)
+
+        self.assertEqual(
+            results, [("text.txt", 5), ("text.txt", 1), ("text.txt", 3), ("", "")]
+        )
+
+    def test_find_refs_batch_overlapping_refs(self):
+        temp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp)
+        with open(os.path.join(temp, "a.txt"), "w") as stream:
+            stream.write("foo.bar.baz\n")
+        tree = Mock()
+        tree.vcs = WorkingCopy(temp)
+
+        reference_finder = ReferenceFinder()
+        results = reference_finder.find_refs_batch(
+            ["foo.bar", "bar.baz"], tree, ["RQ001.yml"] * 2
+        )
+
+        self.assertEqual(results, [("a.txt", 1), ("a.txt", 1)])
+
+    def test_find_refs_batch_prefix_refs(self):
+        temp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp)
+        with open(os.path.join(temp, "a.txt"), "w") as stream:
+            stream.write("REQ1.1\n\n\n\nREQ1\n")
+        tree = Mock()
+        tree.vcs = WorkingCopy(temp)
+
+        reference_finder = ReferenceFinder()
+        results = reference_finder.find_refs_batch(
+            ["REQ1", "REQ1.1"], tree, ["RQ001.yml"] * 2
+        )
+
+        self.assertEqual(results, [("a.txt", 1), ("a.txt", 1)])
+
+    def test_scan_matches_submits_a_window_of_files(self):
+        candidates = [("path{}".format(n), "rel{}".format(n)) for n in range(100)]
+
+        with patch(
+            "doorstop.core.reference_finder._find_lines", return_value={}
+        ) as mock_find:
+            matches = _scan_matches(candidates, Mock())
+            next(matches)
+            matches.close()
+
+        self.assertLessEqual(mock_find.call_count, _SCAN_WORKERS)
+
+    def test_find_ref_requires_word_boundaries(self):
+        tree = Mock()
+        tree.vcs = WorkingCopy(EXTERNAL)
+
+        reference_finder = ReferenceFinder()
+        results = reference_finder.find_refs_batch(
+            ["REF12", "EF123"], tree, ["RQ001.yml"] * 2
+        )
+
+        self.assertEqual(results, [("", ""), ("", "")])
+
+    def test_find_ref_single_requires_word_boundaries(self):
+        tree = Mock()
+        tree.vcs = WorkingCopy(EXTERNAL)
+
+        reference_finder = ReferenceFinder()
+        results = [
+            reference_finder.find_ref(ref, tree, "RQ001.yml")
+            for ref in ("REF12", "EF123")
+        ]
+
+        self.assertEqual(results, [("", ""), ("", "")])
+
+    def test_find_ref_requires_utf8_word_boundaries(self):
+        temp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp)
+        with open(os.path.join(temp, "a.txt"), "w", encoding="utf-8") as stream:
+            stream.write("préfrançaisé ÄREQ1 REQ1é\n(français) REQ1.\n")
+        tree = Mock()
+        tree.vcs = WorkingCopy(temp)
+
+        reference_finder = ReferenceFinder()
+        single = reference_finder.find_ref("français", tree, "RQ001.yml")
+        results = reference_finder.find_refs_batch(
+            ["français", "REQ1"], tree, ["RQ001.yml"] * 2
+        )
+
+        self.assertEqual(single, ("a.txt", 2))
+        self.assertEqual(results, [("a.txt", 2), ("a.txt", 2)])
+
+    def test_find_pattern_reference_extension_pattern(self):
+        tree = Mock()
+        tree.vcs = WorkingCopy(EXTERNAL)
+
+        reference_finder = ReferenceFinder()
+        references = reference_finder.find_pattern_reference(
+            r".*\.txt$", EXTERNAL, tree, "RQ001.yml", "REF123"
+        )
+
+        self.assertEqual(references, [("text.txt", 3)])
+        self.assertIn(r".*\.txt$", tree.vcs.path_index.patterns)
+
+    def test_find_ref_in_batch(self):
+        item_path = os.path.join(EXTERNAL, "RQ001.yml")
+        refs = ["REF123", "REF124"]
+        items = [Mock(active=True, ref=ref, path=item_path) for ref in refs]
+        tree = MagicMock()
+        tree.__iter__.return_value = iter([Mock(prefix="RQ", items=items)])
+        tree.vcs = WorkingCopy(EXTERNAL)
+        reference_finder = ReferenceFinder()
+
+        with patch(
+            "doorstop.core.reference_finder._scan_refs", wraps=_scan_refs
+        ) as mock_scan:
+            with reference_finder.batch(tree):
+                results = [
+                    reference_finder.find_ref(ref, tree, item_path) for ref in refs
+                ]
+            self.assertEqual(mock_scan.call_count, 1)
+            reference_finder.find_ref("REF123", tree, item_path)
+
+        self.assertEqual(mock_scan.call_count, 2)
+        self.assertEqual(results, [("text.txt", 3), ("text.txt", 5)])
+
+    def test_find_ref_text_paths_are_remembered(self):
+        tree = Mock()
+        tree.vcs = WorkingCopy(EXTERNAL)
+        item_path = os.path.join(EXTERNAL, "RQ001.yml")
+
+        reference_finder = ReferenceFinder()
+        path, line = reference_finder.find_ref("REF123", tree, item_path)
+
+        self.assertEqual((path, line), ("text.txt", 3))
+        texts = tree.vcs.path_index.texts
+        self.assertEqual(list(texts), [frozenset(settings.SKIP_EXTS)])
+
+    def test_find_refs_batch_reuses_stored_results(self):
+        temp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp)
+        shutil.copy(os.path.join(EXTERNAL, "text.txt"), temp)
+        item_path = os.path.join(temp, "RQ001.yml")
+        store = self.ref_store(os.path.join(temp, "refs.db"))
+
+        with patch("doorstop.settings.REF_INDEX_PATH", store):
+            tree = Mock()
+            tree.vcs = WorkingCopy(temp)
+            ReferenceFinder.find_refs_batch(["REF123"], tree, [item_path])
+
+            tree.vcs = WorkingCopy(temp)
+            with patch("doorstop.core.reference_finder._find_lines") as mock_find:
+                results = ReferenceFinder.find_refs_batch(["REF123"], tree, [item_path])
+
+        mock_find.assert_not_called()
+        self.assertEqual(results, [("text.txt", 3)])
+
+    def test_find_refs_batch_rescans_changed_files(self):
+        temp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp)
+        path = os.path.join(temp, "text.txt")
+        with open(path, "w") as stream:
+            stream.write("REF123\n")
+        item_path = os.path.join(temp, "RQ001.yml")
+        store = self.ref_store(os.path.join(temp, "refs.db"))
+
+        with patch("doorstop.settings.REF_INDEX_PATH", store):
+            tree = Mock()
+            tree.vcs = WorkingCopy(temp)
+            ReferenceFinder.find_refs_batch(["REF123"], tree, [item_path])
+
+            with open(path, "w") as stream:
+                stream.write("\n\nREF123 changed\n")
+            tree.vcs = WorkingCopy(temp)
+            results = ReferenceFinder.find_refs_batch(["REF123"], tree, [item_path])
+
+        self.assertEqual(results, [("text.txt", 3)])
+
+    def test_find_refs_batch_stores_results_per_ref_and_file(self):
+        temp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp)
+        shutil.copy(os.path.join(EXTERNAL, "text.txt"), temp)
+        other = os.path.join(temp, "other.txt")
+        with open(other, "w") as stream:
+            stream.write("nothing\n")
+        store = self.ref_store(os.path.join(temp, "refs.db"))
+        item_path = os.path.join(temp, "RQ001.yml")
+
+        def search(refs):
+            tree = Mock()
+            tree.vcs = WorkingCopy(temp)
+            return ReferenceFinder.find_refs_batch(refs, tree, [item_path] * len(refs))
+
+        with patch("doorstop.settings.REF_INDEX_PATH", store):
+            for ref in ("REF123", "REF124", "REF122"):
+                search([ref, "REF999"])
+            connection = sqlite3.connect(store)
+            self.addCleanup(connection.close)
+            files = connection.execute("SELECT COUNT(*) FROM files").fetchone()
+            hits = sorted(connection.execute("SELECT ref, lineno FROM hits"))
+
+            with open(other, "w") as stream:
+                stream.write("REF999\n")
+            with patch(
+                "doorstop.core.reference_finder._find_lines", wraps=_find_lines
+            ) as mock_find:
+                results = search(["REF999"])
+
+            os.remove(other)
+            search(["REF999"])
+            remaining = connection.execute("SELECT COUNT(*) FROM files").fetchone()
+
+        self.assertEqual(files, (2,))
+        self.assertEqual(hits, [("REF122", 1), ("REF123", 3), ("REF124", 5)])
+        self.assertEqual(results, [("other.txt", 1)])
+        self.assertEqual([call[0][0] for call in mock_find.call_args_list], [other])
+        self.assertEqual(remaining, (1,))
@@ -14,6 +14,7 @@ from doorstop.core import vcs
 from doorstop.core.base import BaseValidatable
 from doorstop.core.document import Document
 from doorstop.core.item import Item
+from doorstop.core.reference_finder import ReferenceFinder
 from doorstop.core.types import UID, Prefix
 
 UTF8 = "utf-8"
@@ -479,15 +480,16 @@ class Tree(BaseValidatable):  # pylint: disable=R0902
         # Check for documents
         if not documents:
             yield DoorstopWarning("no documents")
-        # Check each document
-        for document in documents:
-            for issue in chain(
-                hook(document=document, tree=self),
-                document.get_issues(skip=skip, item_hook=item_hook),
-            ):
-                # Prepend the document's prefix to yielded exceptions
-                if isinstance(issue, Exception):
-                    yield type(issue)("{}: {}".format(document.prefix, issue))
+        # Check each document, searching all external references together
+        with ReferenceFinder.batch(self, skip=skip):
+            for document in documents:
+                for issue in chain(
+                    hook(document=document, tree=self),
+                    document.get_issues(skip=skip, item_hook=item_hook),
+                ):
+                    # Prepend the document's prefix to yielded exceptions
+                    if isinstance(issue, Exception):
+                        yield type(issue)("{}: {}".format(document.prefix, issue))
 
     def get_traceability(self):
         """Return sorted rows of traceability slices.
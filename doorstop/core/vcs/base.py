@@ -6,13 +6,30 @@ import fnmatch
 import os
 import subprocess
 from abc import ABCMeta, abstractmethod
-from typing import List, Optional, Tuple
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
 from doorstop import common, settings
 
 log = common.logger(__name__)
 
 
+class PathIndex:
+    """Lookup tables derived from a snapshot of working copy paths."""
+
+    def __init__(self, paths):
+        self.paths = paths
+        # normalized path, filename, extension, and relative path of each file
+        self.entries: List[Tuple[str, str, str, str]] = []
+        self.filenames: Dict[str, List[Tuple[str, str]]] = {}
+        self.patterns: Dict[str, List[Tuple[str, str]]] = {}  # filled by users
+        self.texts: Dict[FrozenSet[str], List[Tuple[str, str]]] = {}  # filled by users
+        for path, filename, relpath in paths:
+            path = os.path.normpath(path)
+            extension = os.path.splitext(filename)[-1]
+            self.entries.append((path, filename, extension, relpath))
+            self.filenames.setdefault(filename, []).append((path, relpath))
+
+
 class BaseWorkingCopy(metaclass=ABCMeta):
     """Abstract base class for VCS working copies."""
 
@@ -23,6 +40,7 @@ class BaseWorkingCopy(metaclass=ABCMeta):
         self.path = path
         self._ignores_cache: Optional[List[str]] = None
         self._path_cache: Optional[List[Tuple[str, str, str]]] = None
+        self._index_cache: Optional[PathIndex] = None
 
     @staticmethod
     def relpath(path):
@@ -84,6 +102,19 @@ class BaseWorkingCopy(metaclass=ABCMeta):
     @property
     def paths(self):
         """Yield non-ignored paths in the working copy."""
+        yield from self._get_paths()
+
+    @property
+    def path_index(self):
+        """Get lookup tables for the non-ignored paths in the working copy."""
+        paths = self._get_paths()
+        if self._index_cache is None or self._index_cache.paths is not paths:
+            log.debug("indexing all file paths...")
+            self._index_cache = PathIndex(paths)
+        return self._index_cache
+
+    def _get_paths(self):
+        """Get the cached list of non-ignored paths, reading them if needed."""
         if self._path_cache is None or not settings.CACHE_PATHS:
             log.debug("reading and caching all file paths...")
             self._path_cache = []
@@ -98,7 +129,7 @@ class BaseWorkingCopy(metaclass=ABCMeta):
                     if os.path.sep + "." in os.path.sep + relpath:
                         continue
                     self._path_cache.append((path, filename, relpath))
-        yield from self._path_cache
+        return self._path_cache
 
     def ignored(self, path):
         """Determine if a path matches an ignored pattern."""
@@ -2,6 +2,8 @@
 
 """Unit tests for the doorstop.vcs.base module."""
 
+# pylint: disable=protected-access
+
 import os
 import unittest
 from unittest.mock import patch
@@ -56,3 +58,22 @@ class TestSampleWorkingCopy(unittest.TestCase):
         self.assertNotEqual(
             [], [x for x in paths if x.startswith(os.path.join("doorstop", ""))]
         )
+
+    def test_path_index(self):
+        """Verify the path index is rebuilt when the paths change."""
+        self.wc._path_cache = [("path/a/x.txt", "x.txt", "a/x.txt")]
+        index = self.wc.path_index
+        self.assertIs(index, self.wc.path_index)
+        self.assertEqual([("path/a/x.txt", "a/x.txt")], index.filenames["x.txt"])
+        self.wc._path_cache = [("path/b/x.txt", "x.txt", "b/x.txt")]
+        self.assertEqual(
+            [("path/b/x.txt", "b/x.txt")], self.wc.path_index.filenames["x.txt"]
+        )
+
+    def test_path_index_entries(self):
+        """Verify the path index normalizes paths and splits extensions."""
+        self.wc._path_cache = [("path/./a/x.txt", "x.txt", "a/x.txt")]
+        self.assertEqual(
+            [(os.path.normpath("path/a/x.txt"), "x.txt", ".txt", "a/x.txt")],
+            self.wc.path_index.entries,
+        )
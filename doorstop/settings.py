@@ -20,6 +20,7 @@ VERBOSE3_LOGGING_LEVEL = logging.DEBUG - 1
 # Value constants
 SEP_CHARS = "-_."  # valid prefix/number separators
 SKIP_EXTS = [".yml", ".csv", ".tsv"]  # extensions skipped in reference search
+MAX_REF_SCAN_BYTES = 2_000_000  # larger files are skipped in reference search
 RESERVED_WORDS = ["all"]  # keywords that cannot be used for prefixes
 PLACEHOLDER = "..."  # placeholder for new item UIDs on export/import
 PLACEHOLDER_COUNT = 1  # number of placeholders to include on export
@@ -59,6 +60,7 @@ ADDREMOVE_FILES = True  # automatically add/remove new/changed files
 CACHE_ITEMS = True  # cache items in documents and trees
 CACHE_DOCUMENTS = True  # cache documents in trees
 CACHE_PATHS = True  # cache file/directory paths and contents
+REF_INDEX_PATH = None  # file persisting reference search results, None = disabled
 
 # Server settings
 SERVER_HOST = None  # '' = server not specified, None = no server in use